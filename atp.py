@@ -1,405 +1,307 @@
-import requests
-import re
-from bs4 import BeautifulSoup
-import json
-import time
-import base64
 import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from common import http_client
+from common.cache import JsonCache
+from common.catalog import Catalogue
+from common.crawl import AdaptiveLimiter, run_parallel
+from common.logs import get_logger, setup_logging
+from common.metrics import METRICS, report
+from common.mirrors import MirrorResolver
+from common.extract import extract_video_info, scan_embed_text, scan_page_text
+from common.parsing import iter_links, parse_html
+from common.playlist import M3UWriter
+from common.source import Source, register
+from common.validators import ValidatorStore
 
 # Firebase/Canvas ortam değişkenlerinin kontrolü bu betikte gerekli değildir,
 # çünkü bu bir yerel veya GitHub Actions betiğidir.
 
-def decode_hex_string(hex_string):
-    """Hex encoded string'i decode eder"""
-    try:
-        # Bazen \x'ler tek bir \x olarak gelir, bazen çift \\x olarak.
-        # Her iki durumu da temizlemeye çalışalım.
-        clean_hex = hex_string.replace('\\x', '').replace('x', '') 
-        decoded = bytes.fromhex(clean_hex).decode('utf-8')
-        return decoded
-    except Exception:
-        return None
+# Eşzamanlılık ayarları (GitHub Actions'ta env ile değiştirilebilir)
+SERIES_WORKERS = int(os.environ.get('ATP_SERIES_WORKERS', '4'))
+EPISODE_WORKERS = int(os.environ.get('ATP_EPISODE_WORKERS', '16'))
+EMBED_WORKERS = int(os.environ.get('ATP_EMBED_WORKERS', '16'))
 
-def extract_video_info(content):
-    """Video başlığı ve açıklamasını çıkarır"""
-    video_info = {}
-    
-    # 1. jwSetup/jwplayer config'ten başlık ve açıklama
-    jwsetup_patterns = [
-        r'jwSetup\s*=\s*{([^}]+)}',
-        r'var\s+jwSetup\s*=\s*{([^}]+)}'
-    ]
-    for pattern in jwsetup_patterns:
-        match = re.search(pattern, content, re.DOTALL)
-        if match:
-            jwsetup_content = match.group(1)
-            # Daha esnek regex: [^"\'] - tırnak içindeki her şeyi eşleştirir
-            title_match = re.search(r'(?:title|heading):\s*["\']([^"\']+)["\']', jwsetup_content)
-            if title_match:
-                video_info['title'] = title_match.group(1)
-            desc_match = re.search(r'description:\s*["\']([^"\']+)["\']', jwsetup_content)
-            if desc_match:
-                video_info['description'] = desc_match.group(1)
-            if video_info.get('title') or video_info.get('description'):
-                 break
-    
-    # 2. Genel başlık ve açıklama (jwSetup başarısız olursa)
-    if not video_info.get('title'):
-        title_patterns = [
-            r'"title":\s*"([^"]+)"',
-            r"'title':\s*'([^']+)'",
-            r'title:\s*["\']([^"\']+)["\']'
-        ]
-        for pattern in title_patterns:
-            match = re.search(pattern, content)
-            if match:
-                video_info['title'] = match.group(1)
-                break
-                
-    if not video_info.get('description'):
-        desc_patterns = [
-            r'"description":\s*"([^"]+)"',
-            r"'description':\s*'([^']+)'",
-            r'description:\s*["\']([^"\']+)["\']'
-        ]
-        for pattern in desc_patterns:
-            match = re.search(pattern, content)
-            if match:
-                video_info['description'] = match.group(1)
-                break
-                
-    return video_info
+# Sabit time.sleep'ler yerine host başına uyarlanır eşzamanlılık (en fazla ATP_PER_HOST), saniyede istek
+# bütçesi ve çöken hostlar (ör. ölü vidlax aynası) için devre kesici
+LIMITER = AdaptiveLimiter(
+    max_per_host=int(os.environ.get('ATP_PER_HOST', '16')),
+    rate_per_host=float(os.environ.get('ATP_RATE_PER_HOST', '8')),
+)
+
+# Dizi -> bölüm -> embed zinciri ayrı havuzlarda çalışır; bir havuzdaki iş yalnızca
+# alt seviyedeki havuzu beklediği için iç içe beklemede kilitlenme olmaz.
+EPISODE_POOL = ThreadPoolExecutor(max_workers=EPISODE_WORKERS, thread_name_prefix='atp-episode')
+EMBED_POOL = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix='atp-embed')
+
+# Bölüm yolu -> çözülmüş m3u8/altyazı/video bilgisi önbelleği (çalışmalar arası kalıcı). Anahtar hostsuz
+# yoldur; site aynaya taşındığında (diziyiizle -> diziyiizle4) önbellek geçerli kalır
+CACHE_FILE = os.environ.get('ATP_CACHE_FILE', 'cache/atp_streams.json')
+CACHE_TTL = int(os.environ.get('ATP_CACHE_TTL', str(24 * 3600)))
+# m3u8 bulunamayan bölümler (henüz yayınlanmamış/geçici hata) daha kısa sürede yeniden denenir
+CACHE_NEGATIVE_TTL = int(os.environ.get('ATP_CACHE_NEGATIVE_TTL', str(2 * 3600)))
+# ATP_CACHE_REFRESH=1 ile önbellek yok sayılır ve her bölüm yeniden çözülür
+CACHE_REFRESH = os.environ.get('ATP_CACHE_REFRESH') == '1'
+# Dizi tablosu ve paylaşılan altyazı listeleri; önbellekteki aynı altyazı listeleri de tek kopyaya indirilir
+CATALOGUE = Catalogue()
+STREAM_CACHE = JsonCache(CACHE_FILE, ttl=CACHE_TTL, version=2, compact=CATALOGUE.compact_stream)
+
+# Dizi listesi ve dizi sayfaları için ETag/Last-Modified/içerik özeti deposu
+VALIDATORS = ValidatorStore(os.environ.get('ATP_VALIDATOR_FILE', 'cache/atp_validators.json'))
+
+# Çalışma sonu metrik raporu: isabet oranları için önbellekler kaydedilir, dosya yolu değiştirilebilir
+METRICS.track_cache('streams', STREAM_CACHE)
+METRICS.track_cache('pages', VALIDATORS)
+METRICS.track_limiter('atp', LIMITER)
+METRICS_FILE = os.environ.get('ATP_METRICS_FILE')
+
+# Tüm diziyiizle istekleri için ortak başlıklar (oturumun tarayıcı başlıklarının üzerine eklenir)
+HEADERS = {'Referer': 'https://diziyiizle.com/'}
+
+MASTER_PLAYLIST = "master_all_series_playlist.m3u"
+# Tüm diziler sayfası URL'si; site alan adı değiştirdikçe istekler MIRRORS ile canlı aynaya gider
+SITE_URL = "https://diziyiizle.com"
+ALL_SERIES_URL = f"{SITE_URL}/?post_type=series"
+# diziyiizle -> diziyiizle4, vidlax -> vidlax1 gibi taşınmalar ve yönlendirmeler (çalışmalar arası kalıcı)
+MIRRORS = MirrorResolver(os.environ.get('ATP_MIRROR_FILE', 'cache/atp_mirrors.json'),
+                         ttl=int(os.environ.get('ATP_MIRROR_TTL', str(6 * 3600))))
+
+# ATP_PLAY_BASE verilirse (ör. http://127.0.0.1:8000) bölümler tarama sırasında çözülmez; playlist'e
+# daemon sunucusunun /play/atp/<bölüm> adresi yazılır ve akış ancak oynatılırken çözülür
+PLAY_BASE = os.environ.get('ATP_PLAY_BASE', '').rstrip('/')
+# /play kimliği -> taramada görülen bölüm URL'si
+EPISODE_URLS = {}
+
+def site_url():
+    """diziyiizle'nin canlı kökü (ör. https://diziyiizle4.com)"""
+    return MIRRORS.live_origin(SITE_URL) or SITE_URL
+
+# Link başına ayrıntılar DEBUG seviyesindedir (SCRAPER_LOG_LEVEL=DEBUG ile görünür)
+log = get_logger('atp')
 
 def extract_subtitle_urls(content, base_url):
     """Embed içeriğinden altyazı (.vtt) URL'lerini çıkarır ve tam URL'ye çevirir"""
-    subtitle_urls = []
-    
-    # Altyazı URL'leri için olası pattern'ler
-    subtitle_patterns = [
-        # 1. JWPlayer tracks objeleri
-        r'tracks\s*:\s*(\[.*?\])',
-        r'jwSetup\.tracks\s*=\s*(\[.*?\])',
-        # 2. Genel dosya URL'leri (genellikle 'file' anahtarı ile)
-        r'"file":\s*["\']([^"\'?]*\.vtt[^"\'?]*)[?"\']',
-        r"'file':\s*['\"]([^'\"?]*\.vtt[^'\"?]*)[?'\"]",
-        # 3. Bağıl yollar
-        r'(\.\.\/upload\/[^"\'?]*\/subtitles\/[^"\'?]*\.vtt[^\'"]*)',
-        r'(\/upload\/[^"\'?]*\/subtitles\/[^"\'?]*\.vtt[^\'"]*)',
-    ]
-    
-    # base_url'yi belirle (örneğin: https://vidlax.xyz)
-    if not base_url.endswith('/'):
-        base_url += '/'
-    
-    def resolve_url(path, base):
-        """Bağıl URL'leri mutlak URL'ye çevirir"""
-        path = path.replace('\\/', '/') # Kaçış karakterlerini temizle
-        if path.startswith('http'):
-            return path
-        elif path.startswith('../'):
-            # Buradaki bağıl yol çözümü basittir, vidlax.xyz/a/b/c/.. /a/b/c ye döner.
-            # vidlax.xyz/a/b/../file.vtt -> vidlax.xyz/file.vtt
-            return base.rstrip('/').rsplit('/', 1)[0] + path[2:]
-        elif path.startswith('/'):
-            # /upload/.. -> https://vidlax.xyz/upload/..
-            return base.split('/')[0] + '//' + base.split('/')[2] + path
-        else:
-            # dosya.vtt -> https://vidlax.xyz/dosya.vtt
-            return base + path
-
-    # 1. JSON (tracks) eşleştirmesi
-    for track_pattern in [r'tracks\s*:\s*(\[.*?\])', r'jwSetup\.tracks\s*=\s*(\[.*?\])']:
-        tracks_matches = re.findall(track_pattern, content, re.DOTALL)
-        for tracks_data in tracks_matches:
-            try:
-                tracks_clean = tracks_data.replace('\\/', '/')
-                # JSON içeriğini temizle: tırnak içindeki dize değerlerini temizle
-                tracks_clean = re.sub(r'([\'"])label([\'"]):', '"label":', tracks_clean)
-                tracks_clean = re.sub(r'([\'"])file([\'"]):', '"file":', tracks_clean)
-                tracks_clean = re.sub(r'([\'"])kind([\'"]):', '"kind":', tracks_clean)
-                
-                # Bazen tırnaklar tek tırnak olabiliyor, JSON'a çevirmeden önce çift tırnak yapmaya çalışalım
-                tracks_clean = tracks_clean.replace("'", '"')
-
-                tracks_obj = json.loads(tracks_clean)
-                if isinstance(tracks_obj, list):
-                    for track in tracks_obj:
-                        if 'file' in track and '.vtt' in track['file']:
-                            resolved_url = resolve_url(track['file'], base_url)
-                            subtitle_urls.append({
-                                'url': resolved_url,
-                                'label': track.get('label', 'Bilinmiyor'),
-                            })
-                            print(f"      💬 Altyazı (tracks) bulundu: {track.get('label', 'Bilinmiyor')} - {resolved_url}")
-            except Exception:
-                # print(f"   ❌ JSON parse hatası (Tracks): {e} - İçerik: {tracks_clean[:100]}")
-                pass # JSON parse hatası olduğunda diğer pattern'lere geç
-
-    # 2. Diğer altyazı pattern'leri
-    for pattern in subtitle_patterns:
-        matches = re.findall(pattern, content)
-        for match in matches:
-            if '.vtt' in match:
-                resolved_url = resolve_url(match, base_url)
-                # Zaten tracks objesinden çekilmiş olabilir, kontrol et
-                if not any(sub['url'] == resolved_url for sub in subtitle_urls):
-                    subtitle_urls.append({'url': resolved_url, 'label': 'Altyazı'})
-                    print(f"      💬 Altyazı (regex) bulundu: {resolved_url}")
-
-    return subtitle_urls
+    return list(scan_embed_text(content, base_url).subtitles.values())
+
+def decode_base64_strings(content):
+    """Base64 kodlanmış stringleri decode eder"""
+    scan = scan_embed_text(content, '')
+    return [decoded for decoded in scan.base64_blobs.values() if decoded]
+
+def scan_embed(video_url, page_url):
+    """Tek bir embed sayfasını indirir; video bilgisi, altyazılar, m3u8'ler ve embed'in alınıp alınamadığını döndürür"""
+    video_info = {}
+    subtitles = []
+    m3u8_urls = []
+    ok = True
+    try:
+        # vidlax aynası taşındıysa yönlendirme turu atlanır
+        video_url = MIRRORS.rewrite(video_url)
+        # Referer olarak bölüm sayfasını göndermek önemli
+        with METRICS.timer('embed_fetch'):
+            embed_response = http_client.get(video_url, headers={'Referer': page_url}, limiter=LIMITER,
+                                             hooks=MIRRORS.hooks)
+            embed_response.raise_for_status()
+            embed_content = embed_response.text
+
+        # 1. Video Bilgisi
+        with METRICS.timer('decode'):
+            vinfo = extract_video_info(embed_content)
+            # 2. Altyazılar ve m3u8'ler (HEX/Base64 decode dahil) tek geçişte
+            embed_base_url = '/'.join(video_url.split('/')[:3])
+            scan = scan_embed_text(embed_content, embed_base_url)
+        if vinfo.get('title'):
+            video_info = vinfo # En iyi bilgiyi sakla
+            log.debug(f"🎬 Video Başlığı: {vinfo.get('title')} | Açıklama: {vinfo.get('description', 'Yok')}")
+
+        subtitles = list(scan.subtitles.values())
+        for sub in subtitles:
+            log.debug(f"💬 Altyazı bulundu: {sub['label']} - {sub['url']}")
+        for url, source in scan.m3u8s.items():
+            m3u8_urls.append(url)
+            log.debug(f"🎯 m3u8 bulundu ({source}): {url}")
+
+    except Exception as e:
+        log.warning(f"❌ Embed URL kontrol hatası ({video_url}): {e}")
+        ok = False
+
+    return video_info, subtitles, m3u8_urls, ok
 
 def find_m3u8_url(page_url):
-    """Verilen diziyiizle.com sayfasından m3u8 URL'sini ve altyazıları bulur"""
+    """Verilen diziyiizle.com sayfasından m3u8 URL'sini ve altyazıları bulur.
+
+    Son eleman, sayfanın ve tüm embed'lerin hatasız alınıp alınmadığıdır; ağ hatası/zaman aşımı/açık devre
+    durumunda False olur ve sonuç (boş ya da eksik olabileceği için) önbelleğe yazılmamalıdır.
+    """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'tr-TR,tr;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Referer': 'https://diziyiizle.com/',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        response = requests.get(page_url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        m3u8_urls = []
-        all_subtitle_urls = []
-        embed_urls = []
-        video_info = {}
-        
-        # 1. Sayfa kaynağında script ve genel m3u8/embed URL'leri
-        scripts = soup.find_all('script')
-        for script in scripts:
-            if script.string:
-                script_content = script.string
-                
-                # Doğrudan m3u8
-                m3u8_pattern = r'https://[^\s"\']*\.m3u8[^\s"\']*'
-                m3u8_urls.extend([m for m in re.findall(m3u8_pattern, script_content) if m not in m3u8_urls])
-                
-                # Embed URL'leri
-                video_url_patterns = [
-                    r'videoUrl\s*=\s*["\']([^"\']+)["\']',
-                    r'src:\s*["\']([^"\']*vidlax[^"\']*)["\']',
-                    r'["\']([^"\']*vidlax\.xyz[^"\']*)["\']'
-                ]
-                for pattern in video_url_patterns:
-                    video_matches = re.findall(pattern, script_content)
-                    for video_url in video_matches:
-                        clean_url = video_url.replace('\\/', '/')
-                        if clean_url not in embed_urls:
-                            embed_urls.append(clean_url)
-                            print(f"   📺 Embed URL bulundu: {clean_url}")
-        
-        # 2. HTML'de kalan m3u8'ler
-        page_m3u8 = re.findall(r'https://[^\s"\']*\.m3u8[^\s"\']*', response.text)
-        m3u8_urls.extend([m for m in page_m3u8 if m not in m3u8_urls])
-        vidlax_pattern = r'https://vidlax\.xyz/[^\s"\']*\.m3u8[^\s"\']*'
-        vidlax_matches = re.findall(vidlax_pattern, response.text)
-        m3u8_urls.extend([m for m in vidlax_matches if m not in m3u8_urls])
-
-        # 3. Embed URL'lerini kontrol et (asıl iş burada)
-        for video_url in list(set(embed_urls)): # Benzersiz embed'ler üzerinde dön
-            print(f"   🔍 Embed URL kontrol ediliyor: {video_url}")
+        page_url = MIRRORS.rewrite(page_url)
+        with METRICS.timer('episode_page'):
+            response = http_client.get(page_url, headers=HEADERS, limiter=LIMITER, hooks=MIRRORS.hooks)
+            response.raise_for_status()
+
+            # 1. Sayfadaki doğrudan m3u8'ler ve script'lerdeki embed URL'leri (tek geçiş, ağaç kurulmadan)
+            page_m3u8s, embed_urls = scan_page_text(response.text)
+        m3u8_urls = dict.fromkeys(page_m3u8s)
+        for embed_url in embed_urls:
+            log.debug(f"📺 Embed URL bulundu: {embed_url}")
+
+        # 2. Embed URL'lerini kontrol et (asıl iş burada) - embed'ler paralel indirilir
+        valid_embed_urls = []
+        for video_url in embed_urls:
+            log.debug(f"🔍 Embed URL kontrol ediliyor: {video_url}")
             if not video_url.startswith('http'):
-                print("      ❌ Bağıl/geçersiz embed URL atlandı.")
+                log.debug("❌ Bağıl/geçersiz embed URL atlandı.")
                 continue
+            valid_embed_urls.append(video_url)
 
-            try:
-                # time.sleep(1) # Daha nazik olmak için bekleme eklenebilir
-                embed_headers = headers.copy()
-                embed_headers['Referer'] = page_url # Referer eklemek önemli
-                embed_response = requests.get(video_url, headers=embed_headers, timeout=15)
-                embed_response.raise_for_status()
-                embed_content = embed_response.text
-                
-                # 3.1. Video Bilgisi ve Altyazıları Çıkar
-                vinfo = extract_video_info(embed_content)
-                if vinfo.get('title'):
-                    video_info = vinfo # En iyi bilgiyi sakla
-                    print(f"      🎬 Video Başlığı: {vinfo.get('title')} | Açıklama: {vinfo.get('description', 'Yok')}")
-                
-                embed_base_url = '/'.join(video_url.split('/')[:3])
-                subtitles = extract_subtitle_urls(embed_content, embed_base_url)
-                all_subtitle_urls.extend([sub for sub in subtitles if sub not in all_subtitle_urls])
-
-                # 3.2. HEX Decode ile m3u8 bul
-                hex_patterns = [
-                    r'"file":\s*"(\\x[0-9a-fA-F\\x]+)"',
-                    r"'file':\s*'(\\x[0-9a-fA-F\\x]+)'",
-                    r'(\\x[0-9a-fA-F\\x]+\.m3u8[0-9a-fA-F\\x]*)',
-                ]
-                for pattern in hex_patterns:
-                    hex_matches = re.findall(pattern, embed_content)
-                    for hex_match in hex_matches:
-                        decoded_url = decode_hex_string(hex_match)
-                        if decoded_url and '.m3u8' in decoded_url:
-                            # HEX decode edilmiş URL'ler genellikle bağıldır, vidlax.xyz ile birleştir
-                            full_url = resolve_url(decoded_url, embed_base_url)
-                            if full_url not in m3u8_urls:
-                                m3u8_urls.append(full_url)
-                                print(f"      🎯 HEX DECODE - m3u8 bulundu: {full_url}")
-
-                # 3.3. Base64 Decode ile m3u8 bul
-                decoded_base64_urls = decode_base64_strings(embed_content)
-                for decoded_url in decoded_base64_urls:
-                     full_url = resolve_url(decoded_url, embed_base_url)
-                     if full_url not in m3u8_urls:
-                        m3u8_urls.append(full_url)
-                        print(f"      🎯 BASE64 DECODE - m3u8 bulundu: {full_url}")
-
-                # 3.4. Embed içeriğinde doğrudan m3u8 bul
-                embed_m3u8_patterns = [
-                    r'https://[^\s"\']*\.m3u8[^\s"\']*',
-                    r'"file":\s*"([^"]*\.m3u8[^"]*)"',
-                    r"'file':\s*'([^']*\.m3u8[^']*)'",
-                    r'source:\s*"([^"]*\.m3u8[^"]*)"',
-                    r'src:\s*"([^"]*\.m3u8[^"]*)"'
-                ]
-                for pattern in embed_m3u8_patterns:
-                    embed_matches = re.findall(pattern, embed_content)
-                    for match in embed_matches:
-                        clean_match = match.replace('\\/', '/')
-                        if clean_match not in m3u8_urls:
-                            m3u8_urls.append(clean_match)
-                            print(f"      ✓ Embed'de m3u8 bulundu: {clean_match}")
-                            
-            except Exception as e:
-                print(f"      ❌ Embed URL kontrol hatası ({video_url}): {e}")
-                
-        unique_m3u8_urls = list(set(m3u8_urls))
-        # Altyazıları URL'ye göre benzersizleştir
-        unique_subtitle_urls = []
-        seen_urls = set()
-        for sub in all_subtitle_urls:
-            if sub['url'] not in seen_urls:
-                unique_subtitle_urls.append(sub)
-                seen_urls.add(sub['url'])
-                
-        return unique_m3u8_urls, unique_subtitle_urls, embed_urls, video_info
+        embed_results = run_parallel(
+            lambda video_url: scan_embed(video_url, page_url),
+            valid_embed_urls,
+            executor=EMBED_POOL,
+        )
+
+        # Sonuçları URL'ye göre benzersiz ve embed sırasıyla birleştir
+        video_info = {}
+        subtitle_urls = {}
+        complete = True
+        for vinfo, subtitles, embed_m3u8_urls, ok in embed_results:
+            complete = complete and ok
+            if vinfo.get('title'):
+                video_info = vinfo
+            for sub in subtitles:
+                subtitle_urls.setdefault(sub['url'], sub)
+            m3u8_urls.update(dict.fromkeys(embed_m3u8_urls))
+
+        return list(m3u8_urls), list(subtitle_urls.values()), embed_urls, video_info, complete
         
     except Exception as e:
-        print(f"Hata oluştu: {e}")
-        return [], [], [], {}
+        log.warning(f"Hata oluştu ({page_url}): {e}", extra={'episode': page_url})
+        return [], [], [], {}, False
+
+def resolve_episode(ep_url):
+    """find_m3u8_url sonucunu önbellekten döndürür; yoksa veya süresi dolduysa yeniden çözer"""
+    if not CACHE_REFRESH:
+        cached = STREAM_CACHE.get(episode_id(ep_url))
+        if cached is not None:
+            log.debug(f"💾 Önbellekten: {ep_url}")
+            return cached['m3u8s'], cached['subtitles'], cached['embeds'], cached['video_info']
+
+    m3u8s, subtitles, embed_urls, vinfo, complete = find_m3u8_url(ep_url)
+    # Ağ hatalı (boş/eksik) sonuçlar önbelleğe yazılmaz; "m3u8 yok" yalnızca sayfa ve tüm embed'ler
+    # gerçekten alınıp ayrıştırıldıysa kısa süreli önbelleğe alınır
+    if complete:
+        STREAM_CACHE.set(
+            episode_id(ep_url),
+            {'m3u8s': m3u8s, 'subtitles': subtitles, 'embeds': embed_urls, 'video_info': vinfo},
+            ttl=CACHE_TTL if m3u8s else CACHE_NEGATIVE_TTL,
+        )
+    return m3u8s, subtitles, embed_urls, vinfo
+
+def episode_id(ep_url):
+    """Bölüm URL'sinin site içi yolu; /play/atp/<kimlik> adresinde kullanılır"""
+    return urlsplit(ep_url).path.strip('/')
+
+def resolve_play(item_id, params=None):
+    """/play/atp/<kimlik> isteği için bölümün ilk m3u8 adresini döndürür"""
+    ep_url = EPISODE_URLS.get(item_id) or f"{site_url()}/{item_id}/"
+    m3u8s = resolve_episode(ep_url)[0]
+    return m3u8s[0] if m3u8s else None
 
 def analyze_vidlax_direct(embed_url):
     """Vidlax embed URL'sini doğrudan analiz eder (find_m3u8_url tarafından zaten yapılıyor, bu artık fazlalık)"""
-    return find_m3u8_url(embed_url)
+    return find_m3u8_url(embed_url)[:4]
 
 
-def decode_base64_strings(content):
-    """Base64 kodlanmış stringleri decode eder"""
-    base64_patterns = [
-        r'atob\(["\']([A-Za-z0-9+/=]+)["\']',
-        # Daha uzun base64 stringlerini yakalamak için (20 karakterden fazla)
-        r'["\']([A-Za-z0-9+/=]{20,})["\']' 
-    ]
-    decoded_strings = []
-    for pattern in base64_patterns:
-        matches = re.findall(pattern, content)
-        for match in matches:
-            # Base64 stringini kontrol et, genellikle 4'ün katı uzunlukta olmalı
-            if len(match) % 4 == 0:
-                try:
-                    decoded = base64.b64decode(match).decode('utf-8')
-                    if '.m3u8' in decoded and not decoded.startswith('//'): # Bazen decode yanlış olur
-                        decoded_strings.append(decoded)
-                        print(f"      🔓 Base64 decode edildi: {decoded}")
-                except Exception:
-                    pass
-    return decoded_strings
+def parse_episode_page(html, series_url):
+    """Dizi sayfası HTML'inden bölüm linklerini, posteri, backdrop ve grubu çıkarır"""
+    doc = parse_html(html)
+    
+    episode_links = []
+    
+    # 1. Poster ve Backdrop URL'lerini bul
+    poster_url = None
+    backdrop_url = None
+    
+    # Poster'i bulmak için öncelikli yollar (genellikle serinin görselidir)
+    img_poster = doc.select_one('img[src*="series_poster_"]') or doc.select_one('div.overflow-hidden img')
+    if img_poster and img_poster.get('src'):
+        poster_url = img_poster.get('src').strip()
+    
+    # Backdrop'u bulmak için (genellikle arkaplan görselidir)
+    img_backdrop = doc.select_one('img[src*="series_backdrop_"]') or doc.select_one('div.absolute.inset-0 img') or doc.select_one('div.relative img')
+    if img_backdrop and img_backdrop.get('src'):
+        backdrop_url = img_backdrop.get('src').strip()
+
+    # Meta etiketlerden (Open Graph) yedekleme
+    meta_img = doc.select_one('meta[property="og:image"]')
+    if (not poster_url or poster_url.startswith('data:image')) and meta_img:
+        if meta_img.get('content') and not meta_img.get('content').startswith('data:image'):
+            poster_url = meta_img.get('content').strip()
+            if not backdrop_url: # Backdrop bulunamazsa, posteri backdrop olarak da kullan
+                backdrop_url = poster_url
+                
+    # 2. Grup adını (Platform) bul
+    group_name = None
+    h4 = next((tag for tag in doc.select('h4') if 'Platform' in tag.text()), None)
+    if h4:
+        sibling = h4.next_sibling()
+        if sibling:
+            span_tag = sibling.select_one('span')
+            if span_tag:
+                group_name = ' '.join(span_tag.text().split())
+    if not group_name:
+        # Yedek: Platform etiketleri veya linkleri
+        span_fallback = doc.select_one('div.flex.flex-wrap.gap-2 span') or doc.select_one('a[href*="/platform/"]')
+        if span_fallback:
+            group_name = ' '.join(span_fallback.text().split())
+    
+    # 3. Bölüm linklerini bul (ağaç yerine akış halinde, tek geçişte)
+    # Önce "/sezon-...-bolum/" linkleri, sonra kalan "-bolum/" linkleri (eski seçici sırası)
+    season_links = []
+    other_links = []
+    for href, episode_text in iter_links(html, contains='-bolum/'):
+        (season_links if '/sezon-' in href else other_links).append((href, episode_text))
+    
+    # Benzersiz linkler için set kullan
+    unique_episode_urls = set()
+    # Kök-göreli linkler sayfanın geldiği (canlı) hosta bağlanır
+    site = '/'.join(series_url.split('/')[:3])
+    
+    for href, episode_text in season_links + other_links:
+        if href and 'bolum' in href:
+            if href.startswith('/'):
+                full_url = site + href
+            elif href.startswith('http'):
+                full_url = href
+            else:
+                # Bağıl ama / ile başlamayan (örneğin: "sezon-1-bolum-1/") durumlar
+                full_url = series_url.rstrip('/') + '/' + href.lstrip('/')
+                
+            if full_url not in unique_episode_urls:
+                unique_episode_urls.add(full_url)
+                episode_links.append((full_url, episode_text))
+                log.debug(f"📺 Bölüm bulundu: {episode_text} - {full_url}")
+
+    return [episode_links, poster_url, backdrop_url, group_name]
 
 def extract_episode_links(series_url):
     """Dizi ana sayfasından tüm bölüm linklerini, posteri, backdrop ve grubu çıkarır"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'tr-TR,tr;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Referer': 'https://diziyiizle.com/',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        response = requests.get(series_url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        episode_links = []
-        
-        # 1. Poster ve Backdrop URL'lerini bul
-        poster_url = None
-        backdrop_url = None
-        
-        # Poster'i bulmak için öncelikli yollar (genellikle serinin görselidir)
-        img_poster = soup.select_one('img[src*="series_poster_"]') or soup.select_one('div.overflow-hidden img')
-        if img_poster and img_poster.get('src'):
-            poster_url = img_poster['src'].strip()
-        
-        # Backdrop'u bulmak için (genellikle arkaplan görselidir)
-        img_backdrop = soup.select_one('img[src*="series_backdrop_"]') or soup.select_one('div.absolute.inset-0 img') or soup.select_one('div.relative img')
-        if img_backdrop and img_backdrop.get('src'):
-            backdrop_url = img_backdrop['src'].strip()
-
-        # Meta etiketlerden (Open Graph) yedekleme
-        if (not poster_url or poster_url.startswith('data:image')) and soup.find('meta', property='og:image'):
-            meta_img = soup.find('meta', property='og:image')
-            if meta_img and meta_img.get('content') and not meta_img['content'].startswith('data:image'):
-                poster_url = meta_img['content'].strip()
-                if not backdrop_url: # Backdrop bulunamazsa, posteri backdrop olarak da kullan
-                    backdrop_url = poster_url
-                    
-        # 2. Grup adını (Platform) bul
-        group_name = None
-        h4 = soup.find(lambda tag: tag.name == 'h4' and 'Platform' in tag.get_text())
-        if h4:
-            sibling = h4.find_next_sibling()
-            if sibling:
-                span_tag = sibling.select_one('span') or sibling.find('span')
-                if span_tag:
-                    group_name = ' '.join(span_tag.get_text(strip=True).split())
-        if not group_name:
-            # Yedek: Platform etiketleri veya linkleri
-            span_fallback = soup.select_one('div.flex.flex-wrap.gap-2 span') or soup.select_one('a[href*="/platform/"]')
-            if span_fallback:
-                group_name = ' '.join(span_fallback.get_text(strip=True).split())
-        
-        # 3. Bölüm linklerini bul
-        episode_patterns = [
-            'a[href*="/sezon-"][href*="-bolum/"]',
-            'a[href*="-bolum/"]',
-        ]
-        
-        # Benzersiz linkler için set kullan
-        unique_episode_urls = set()
-        
-        for pattern in episode_patterns:
-            links = soup.select(pattern)
-            for link in links:
-                href = link.get('href')
-                if href and 'bolum' in href:
-                    if href.startswith('/'):
-                        full_url = 'https://diziyiizle.com' + href
-                    elif href.startswith('http'):
-                        full_url = href
-                    else:
-                        # Bağıl ama / ile başlamayan (örneğin: "sezon-1-bolum-1/") durumlar
-                        full_url = series_url.rstrip('/') + '/' + href.lstrip('/')
-                        
-                    if full_url not in unique_episode_urls:
-                        unique_episode_urls.add(full_url)
-                        episode_text = link.get_text(strip=True)
-                        episode_links.append((full_url, episode_text))
-                        print(f"   📺 Bölüm bulundu: {episode_text} - {full_url}")
-                        
-        print(f"\n   📊 Toplam {len(episode_links)} bölüm bulundu. Poster: {poster_url or 'Yok'}")
+        # Sayfa önceki çalışmadan beri değişmediyse (304/aynı özet) önceki sonuç yeniden kullanılır
+        series_url = MIRRORS.rewrite(series_url)
+        with METRICS.timer('series_page'):
+            episode_links, poster_url, backdrop_url, group_name = VALIDATORS.fetch(
+                series_url, lambda html: parse_episode_page(html, series_url),
+                headers=HEADERS, limiter=LIMITER, hooks=MIRRORS.hooks,
+            )
+        log.info(f"📊 Toplam {len(episode_links)} bölüm bulundu. Poster: {poster_url or 'Yok'}",
+                 extra={'series': series_url, 'episodes': len(episode_links)})
         
         return episode_links, poster_url, backdrop_url, group_name
         
     except Exception as e:
-        print(f"❌ Dizi sayfası analiz hatası ({series_url}): {e}")
+        log.error(f"❌ Dizi sayfası analiz hatası ({series_url}): {e}", extra={'series': series_url})
         return [], None, None, None
 
 def create_m3u_playlist(entries, series_url, filename_prefix=""):
@@ -413,277 +315,286 @@ def create_m3u_playlist(entries, series_url, filename_prefix=""):
         else:
             filename = f"playlists/{series_name}_playlist.m3u"
             
-        os.makedirs('playlists', exist_ok=True)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("#EXTM3U\n")
-            f.write(f"# {series_name.upper().replace('_', ' ')} - TÜM BÖLÜMLER\n")
-            f.write(f"# Oluşturma Tarihi: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Toplam Bölüm: {len(entries)}\n")
-            f.write(f"# Dizi URL: {series_url}\n")
+        # Geçici dosyaya yazılır, yalnızca tamamlanınca eski playlist'in yerine geçer
+        with M3UWriter(filename) as f:
+            f.comment(f"{series_name.upper().replace('_', ' ')} - TÜM BÖLÜMLER")
+            f.comment(f"Toplam Bölüm: {len(entries)}")
+            f.comment(f"Dizi URL: {series_url}")
             
-            # İlk girişten ortak meta verileri yaz (poster, backdrop, grup)
-            if entries and entries[0].get('poster'):
-                f.write(f"# Poster: {entries[0]['poster']}\n")
-            if entries and entries[0].get('backdrop'):
-                f.write(f"# Backdrop: {entries[0]['backdrop']}\n")
-            if entries and entries[0].get('group'):
-                f.write(f"# Grup: {entries[0]['group']}\n")
-            f.write("\n")
+            # Dizinin ortak meta verilerini yaz (poster, backdrop, grup)
+            series = entries[0].section if entries else CATALOGUE.series_for(series_url)
+            if series.poster:
+                f.comment(f"Poster: {series.poster}")
+            if series.backdrop:
+                f.comment(f"Backdrop: {series.backdrop}")
+            if series.group:
+                f.comment(f"Grup: {series.group}")
+            f.line()
             
             for entry in entries:
-                # M3U niteliklerini oluştur
-                tvg_logo = entry.get('poster') or entry.get('backdrop') or ''
-                attrs = []
-                if tvg_logo:
-                    attrs.append(f'tvg-logo="{tvg_logo}"')
-                if entry.get('group'):
-                    attrs.append(f'group-title="{entry["group"]}"')
-                
-                attr_str = ' '.join(attrs)
-                
-                # EXTINF satırı
-                f.write(f'#EXTINF:-1 {attr_str},{entry["title"]}\n')
+                # EXTINF, altyazı bilgisi (VLC ve bazı oynatıcılar için) ve video URL'si
+                f.add(entry)
+                f.line()
                 
-                # Altyazı Bilgisi (VLC ve bazı oynatıcılar için)
-                if entry.get('subtitles'):
-                    for sub in entry['subtitles']:
-                        # EXTVLCSUB: VLC için altyazı yolu. Diğer oynatıcılar (Kodi, Perfect Player) farklı etiketler kullanabilir.
-                        # En yaygın olanı #EXTVLCSUB
-                        f.write(f'#EXTVLCSUB:{sub["url"]}\n') 
-                        f.write(f'#EXTVLCSUB-TITLE:{sub.get("label", "Altyazı")}\n')
-                        f.write(f'#EXTVLCSUB-LANGUAGE:{sub.get("label", "tr")}\n')
-                        
-                # Video URL'si
-                f.write(f"{entry['url']}\n\n")
-                
-        print(f"   📁 Playlist dosyası oluşturuldu: {filename}")
+        if not f.written:
+            return None
+        log.debug(f"📁 Playlist dosyası oluşturuldu: {filename}")
         return filename
     except Exception as e:
-        print(f"❌ Playlist oluşturma hatası: {e}")
+        log.error(f"❌ Playlist oluşturma hatası: {e}")
         return None
 
-def create_master_playlist(entries):
-    """Tüm diziler için master playlist dosyası oluşturur"""
-    try:
-        filename = "master_all_series_playlist.m3u"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("#EXTM3U\n")
-            f.write(f"# TÜM DİZİLER - MASTER PLAYLIST\n")
-            f.write(f"# Oluşturma Tarihi: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Toplam Bölüm: {len(entries)}\n\n")
-            
-            series_groups = {}
-            for entry in entries:
-                # Dizinin URL'sini temizle ve grup anahtarı olarak kullan
-                series_url = entry['series_url'].rstrip('/')
-                series_groups.setdefault(series_url, []).append(entry)
-                
-            for series_url, series_entries in series_groups.items():
-                series_name = series_url.split('/')[-1].replace('-', ' ').upper()
-                f.write(f"\n# === {series_name} === ({len(series_entries)} bölüm)\n")
-                
-                # Grup başlığını ve logoları buraya da ekle
-                group_title = series_entries[0].get('group', 'Dizi')
-                f.write(f'#EXTGRP:{group_title}\n') # Playlist grubunu tanımla
+def write_master_series(master, series_entries):
+    """Bir dizinin girişlerini açık master playlist'e blok olarak ekler"""
+    series = series_entries[0].section
+    series_name = series.url.rstrip('/').split('/')[-1].replace('-', ' ').upper()
+    master.line()
+    master.comment(f"=== {series_name} === ({len(series_entries)} bölüm)")
+    
+    # Grup başlığını ve logoları buraya da ekle
+    group_title = series.group or 'Dizi'
+    master.line(f'#EXTGRP:{group_title}') # Playlist grubunu tanımla
+    
+    if series.poster:
+        master.comment(f"Poster: {series.poster}")
+    if series.backdrop:
+        master.comment(f"Backdrop: {series.backdrop}")
+        
+    for entry in series_entries:
+        attrs = entry.attrs()
+        # group-title M3U standardına göre her EXTINF'te olmalıdır
+        attrs.setdefault('group-title', group_title)
+        
+        master.entry(entry.title, entry.url, attrs, entry.extra_lines())
+        master.line()
+
+def parse_series_list(html, site=SITE_URL):
+    """Diziler sayfası HTML'inden dizi linklerini çıkarır; göreli linkler site köküne bağlanır"""
+    series_links = []
+    unique_links = set()
+    
+    series_patterns = ['/dizi/', '/series/', '/show/']
+    
+    # 1. Mevcut sayfadaki linkleri tek geçişte bul; sıra eski seçici sırasını korur
+    # (önce /dizi/ linkleri, sonra /series/, sonra /show/)
+    buckets = [[] for _ in series_patterns]
+    for href, _ in iter_links(html, contains=series_patterns):
+        for bucket, pattern in zip(buckets, series_patterns):
+            if pattern in href:
+                bucket.append(href)
+                break
+    
+    for bucket in buckets:
+        for href in bucket:
+            if href and 'bolum' not in href and '#' not in href and href != '/dizi/':
+                if href.startswith('/'):
+                    full_url = site + href
+                elif href.startswith('http'):
+                    full_url = href
+                else:
+                    full_url = site + '/' + href
                 
-                if series_entries[0].get('poster'):
-                    f.write(f"# Poster: {series_entries[0]['poster']}\n")
-                if series_entries[0].get('backdrop'):
-                    f.write(f"# Backdrop: {series_entries[0]['backdrop']}\n")
-                    
-                for entry in series_entries:
-                    tvg_logo = entry.get('poster') or entry.get('backdrop') or ''
-                    attrs = []
-                    if tvg_logo:
-                        attrs.append(f'tvg-logo="{tvg_logo}"')
-                        
-                    # group-title M3U standardına göre her EXTINF'te olmalıdır
-                    attrs.append(f'group-title="{entry.get("group", "Dizi")}"') 
-                    attr_str = ' '.join(attrs)
-                    
-                    f.write(f'#EXTINF:-1 {attr_str},{entry["title"]}\n')
-                    
-                    # Altyazı Bilgisi
-                    if entry.get('subtitles'):
-                        for sub in entry['subtitles']:
-                            f.write(f'#EXTVLCSUB:{sub["url"]}\n')
-                            f.write(f'#EXTVLCSUB-TITLE:{sub.get("label", "Altyazı")}\n')
-                            f.write(f'#EXTVLCSUB-LANGUAGE:{sub.get("label", "tr")}\n')
-                            
-                    f.write(f"{entry['url']}\n\n")
+                # URL'yi temizle ve ekle
+                full_url = full_url.split('?')[0].rstrip('/')
+                if full_url not in unique_links:
+                    unique_links.add(full_url)
+                    series_links.append(full_url)
+                    log.debug(f"📺 Dizi bulundu: {full_url}")
                     
-        print(f"\n📁 Master playlist oluşturuldu: {filename}")
-    except Exception as e:
-        print(f"❌ Master playlist hatası: {e}")
+    # Sayfalamayı kontrol et (ilk sayfadan toplananlar yeterli olmazsa)
+    # Bu kısım zaman alıcı olabileceği için varsayılan olarak basitleştirilmiştir.
+    return series_links
 
 def extract_all_series_links(series_page_url):
     """Tüm dizilerin linklerini çıkarır"""
     # Bu fonksiyon orijinal betikte zaten iyi çalışıyordu, küçük bir düzenleme ile devam
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'tr-TR,tr;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Referer': 'https://diziyiizle.com/',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        response = requests.get(series_page_url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        series_links = []
-        unique_links = set()
-        
-        series_patterns = [
-            'a[href*="/dizi/"]',
-            'a[href*="/series/"]',
-            'a[href*="/show/"]'
-        ]
-        
-        # 1. Mevcut sayfadaki linkleri bul
-        for pattern in series_patterns:
-            links = soup.select(pattern)
-            for link in links:
-                href = link.get('href')
-                if href and 'bolum' not in href and '#' not in href and href != '/dizi/':
-                    if href.startswith('/'):
-                        full_url = 'https://diziyiizle.com' + href
-                    elif href.startswith('http'):
-                        full_url = href
-                    else:
-                        full_url = 'https://diziyiizle.com/' + href
-                    
-                    # URL'yi temizle ve ekle
-                    full_url = full_url.split('?')[0].rstrip('/')
-                    if full_url not in unique_links:
-                        unique_links.add(full_url)
-                        series_links.append(full_url)
-                        print(f"   📺 Dizi bulundu: {full_url}")
-                        
-        # 2. Sayfalamayı kontrol et (ilk sayfadan toplananlar yeterli olmazsa)
-        # Bu kısım zaman alıcı olabileceği için varsayılan olarak basitleştirilmiştir.
+        series_page_url = MIRRORS.rewrite(series_page_url)
+        site = '/'.join(series_page_url.split('/')[:3])
+        with METRICS.timer('listing'):
+            series_links = VALIDATORS.fetch(series_page_url, lambda html: parse_series_list(html, site),
+                                            headers=HEADERS, limiter=LIMITER, hooks=MIRRORS.hooks)
         
-        print(f"\n   📊 Toplam {len(series_links)} dizi bulundu")
+        log.info(f"📊 Toplam {len(series_links)} dizi bulundu")
         return series_links
         
     except Exception as e:
-        print(f"❌ Dizi listesi çıkarım hatası: {e}")
+        log.error(f"❌ Dizi listesi çıkarım hatası: {e}")
         return []
 
-def process_all_series(series_page_url, max_series=None):
-    """Tüm dizileri işler"""
+def process_episode(j, total, ep_url, ep_title_text, series):
+    """Tek bir bölümün m3u8/altyazılarını çözer ve playlist girişlerini (Entry) döndürür"""
+    log.debug(f"🔍 [{j}/{total}] Bölüm: {ep_url}")
+    entries = []
+    if PLAY_BASE:
+        # Tembel mod: embed'ler taranmaz; önceki çalışmalardan önbellekte varsa altyazılar yine eklenir
+        item_id = episode_id(ep_url)
+        EPISODE_URLS[item_id] = ep_url
+        cached = STREAM_CACHE.get(item_id) or {}
+        return [series.entry(ep_title_text or f"Bölüm {j}", f"{PLAY_BASE}/play/atp/{item_id}", ep_url,
+                             cached.get('subtitles', []))]
     try:
-        print(f"🌟 PROCESS ALL: {series_page_url}")
-        series_links = extract_all_series_links(series_page_url)
-        
-        if not series_links:
-            print("❌ Hiç dizi bulunamadı.")
-            return
+        # find_m3u8_url hem m3u8'leri hem de altyazıları çekiyor; önceki çalışmada çözülenler önbellekten gelir
+        m3u8s, subtitles, embed_urls, vinfo = resolve_episode(ep_url)
 
-        if max_series and isinstance(max_series, int):
-            series_links = series_links[:max_series]
-            
-        all_entries = []
-        
-        for idx, series_url in enumerate(series_links, 1):
-            print(f"\n{'='*60}")
-            print(f"🎬 [{idx}/{len(series_links)}] İşleniyor: {series_url}")
-            
-            if series_url == "https://diziyiizle.com/dizi":
-                print("   ❌ Kategori sayfası atlandı")
-                continue
-                
-            try:
-                # ep_links (bölüm URL'si, bölüm adı) tuple listesidir
-                ep_links_info, poster, backdrop, group = extract_episode_links(series_url)
-                
-                if not ep_links_info:
-                    print("   ❌ Bu dizide bölüm bulunamadı")
-                    continue
-                    
-                series_entries = []
-                
-                for j, (ep_url, ep_title_text) in enumerate(ep_links_info, 1):
-                    print(f"   🔍 [{j}/{len(ep_links_info)}] Bölüm: {ep_url}")
-                    
-                    try:
-                        # find_m3u8_url artık hem m3u8'leri hem de altyazıları çekiyor
-                        m3u8s, subtitles, embed_urls, vinfo = find_m3u8_url(ep_url)
-                        
-                        if m3u8s:
-                            # Bölüm adını video bilgisinden veya linkten al
-                            title_from_vinfo = vinfo.get('title', '').strip()
-                            desc_from_vinfo = vinfo.get('description', '').strip()
-                            
-                            if title_from_vinfo and desc_from_vinfo and title_from_vinfo != desc_from_vinfo:
-                                ep_title = f"{title_from_vinfo} - {desc_from_vinfo}"
-                            elif title_from_vinfo:
-                                ep_title = title_from_vinfo
-                            else:
-                                ep_title = ep_title_text or f"Bölüm {j}"
-                            
-                            # Her m3u8 URL'si için bir giriş oluştur
-                            for u in m3u8s:
-                                entry = {
-                                    'title': ep_title,
-                                    'url': u,
-                                    'episode_url': ep_url,
-                                    'series_url': series_url,
-                                    'poster': poster,
-                                    'backdrop': backdrop,
-                                    'group': group,
-                                    'subtitles': subtitles # Altyazıları buraya ekle
-                                }
-                                series_entries.append(entry)
-                                all_entries.append(entry)
-                            
-                            print(f"      ✅ {ep_title} - {len(m3u8s)} m3u8, {len(subtitles)} altyazı")
-                        else:
-                            print("      ❌ m3u8 bulunamadı")
-                            
-                    except Exception as e:
-                        print(f"      ❌ Bölüm işleme hatası: {e}")
-                        
-                    # Her 5 bölümden sonra biraz bekleme
-                    if j % 5 == 0:
-                        time.sleep(1)
-                        
-                if series_entries:
-                    # Dizi bazında playlist oluştur
-                    create_m3u_playlist(series_entries, series_url, filename_prefix="individual")
-                    print(f"   ✅ Dizi tamamlandı: {len(series_entries)} m3u8 eklendi")
-                else:
-                    print("   ❌ Bu dizi için hiç m3u8 bulunamadı")
-                    
-            except Exception as e:
-                print(f"   ❌ Dizi ana sayfa hatası: {e}")
-                
-            # Her dizi arasında bekleme
-            time.sleep(1.5)
-            
-        if all_entries:
-            # Tüm diziler için master playlist oluştur
-            create_master_playlist(all_entries)
-            print(f"\n📁 Tüm diziler için master playlist oluşturuldu ({len(all_entries)} item).")
+        if m3u8s:
+            # Bölüm adını video bilgisinden veya linkten al
+            title_from_vinfo = vinfo.get('title', '').strip()
+            desc_from_vinfo = vinfo.get('description', '').strip()
+
+            if title_from_vinfo and desc_from_vinfo and title_from_vinfo != desc_from_vinfo:
+                ep_title = f"{title_from_vinfo} - {desc_from_vinfo}"
+            elif title_from_vinfo:
+                ep_title = title_from_vinfo
+            else:
+                ep_title = ep_title_text or f"Bölüm {j}"
+
+            # Her m3u8 URL'si için bir giriş oluştur
+            for u in m3u8s:
+                entries.append(series.entry(ep_title, u, ep_url, subtitles))
+
+            log.debug(f"✅ {ep_title} - {len(m3u8s)} m3u8, {len(subtitles)} altyazı",
+                      extra={'episode': ep_url, 'm3u8s': len(m3u8s), 'subtitles': len(subtitles)})
         else:
-            print("\n❌ Hiç m3u8 bulunamadı, master playlist oluşturulmadı.")
-            
+            log.debug(f"❌ m3u8 bulunamadı: {ep_url}", extra={'episode': ep_url, 'm3u8s': 0})
+
+    except Exception as e:
+        log.warning(f"❌ Bölüm işleme hatası ({ep_url}): {e}", extra={'episode': ep_url})
+
+    return entries
+
+def process_series(idx, total, series_url):
+    """Bir dizinin bölümlerini paralel çözer, dizi playlist'ini yazar ve girişleri döndürür"""
+    log.info(f"🎬 [{idx}/{total}] İşleniyor: {series_url}")
+
+    if urlsplit(series_url).path.rstrip('/') == '/dizi':
+        log.info("❌ Kategori sayfası atlandı")
+        return []
+
+    try:
+        # ep_links (bölüm URL'si, bölüm adı) tuple listesidir
+        ep_links_info, poster, backdrop, group = extract_episode_links(series_url)
+
+        if not ep_links_info:
+            log.info(f"❌ Bu dizide bölüm bulunamadı: {series_url}", extra={'series': series_url, 'episodes': 0})
+            return []
+        series = CATALOGUE.series_for(series_url, poster, backdrop, group)
+
+        # Bölümler havuzda paralel çözülür, sonuçlar bölüm sırasıyla birleştirilir
+        episode_results = run_parallel(
+            lambda args: process_episode(args[0], len(ep_links_info), args[1][0], args[1][1], series),
+            enumerate(ep_links_info, 1),
+            executor=EPISODE_POOL,
+        )
+        series_entries = [entry for entries in episode_results for entry in entries]
+        METRICS.incr('episodes', len(ep_links_info))
+        METRICS.incr('entries', len(series_entries))
+
+        if series_entries:
+            # Dizi bazında playlist oluştur
+            with METRICS.timer('write'):
+                create_m3u_playlist(series_entries, series_url, filename_prefix="individual")
+            log.info(f"✅ Dizi tamamlandı: {series_url} ({len(series_entries)} m3u8 eklendi)",
+                     extra={'series': series_url, 'entries': len(series_entries)})
+        else:
+            log.info(f"❌ Bu dizi için hiç m3u8 bulunamadı: {series_url}", extra={'series': series_url, 'entries': 0})
+        return series_entries
+
+    except Exception as e:
+        log.error(f"❌ Dizi ana sayfa hatası ({series_url}): {e}", extra={'series': series_url})
+        return []
+
+@register
+class AtpSource(Source):
+    """diziyiizle dizi arşivi -> master_all_series_playlist.m3u ve playlists/individual_*.m3u"""
+
+    name = 'atp'
+    output = MASTER_PLAYLIST
+    workers = SERIES_WORKERS
+    interval = 2 * 3600
+    priority = 9
+    heavy = True
+    kind = 'series'
+
+    def __init__(self, series_page_url=ALL_SERIES_URL, max_series=None):
+        super().__init__()
+        self.series_page_url = series_page_url
+        self.max_series = max_series
+        self.total = 0
+
+    def discover(self):
+        # Canlı ayna çalışma başında bir kez bulunur; sonraki tüm linkler doğrudan ona üretilir
+        site = MIRRORS.discover(SITE_URL, headers=HEADERS, limiter=LIMITER)
+        HEADERS['Referer'] = f'{site}/'
+        log.info(f"🌟 PROCESS ALL: {self.series_page_url} ({site})")
+        series_links = extract_all_series_links(self.series_page_url)
+        if self.max_series and isinstance(self.max_series, int):
+            series_links = series_links[:self.max_series]
+        self.total = len(series_links)
+        return list(enumerate(series_links, 1))
+
+    def resolve(self, item):
+        idx, series_url = item
+        return process_series(idx, self.total, series_url)
+
+    def emit(self, results):
+        # Diziler paralel işlenir; her dizi (kendisinden öncekiler bitince) sırayla doğrudan
+        # master playlist'e akıtılır, böylece tüm girişler bellekte biriktirilmez.
+        # Toplam bölüm sayısı yazım bitmeden bilinmediği için dosyanın sonuna eklenir.
+        with M3UWriter(self.output) as master:
+            master.comment("TÜM DİZİLER - MASTER PLAYLIST")
+            for series_entries in results:
+                if series_entries:
+                    with METRICS.timer('write'):
+                        write_master_series(master, series_entries)
+            master.line()
+            master.comment(f"Toplam Bölüm: {master.count}")
+        self.count = master.count
+        self.changed = master.changed
+        return master.written
+
+    def run(self):
+        # Daemon'da modül süreç boyunca yaşar; önceki çalışmaların dizileri ve stringleri tutulmaz
+        CATALOGUE.reset()
+        try:
+            written = super().run()
+        finally:
+            # Süresi dolan kayıtları at ve önbelleği bir sonraki çalışma için kaydet
+            expired = STREAM_CACHE.prune()
+            STREAM_CACHE.save()
+            VALIDATORS.save()
+            MIRRORS.save()
+            log.info(f"💾 Önbellek: {STREAM_CACHE.hits} isabet, {STREAM_CACHE.misses} yeni çözüm, "
+                     f"{expired} süresi dolan kayıt silindi ({len(STREAM_CACHE)} kayıt)")
+            log.info(f"💾 Sayfalar: {VALIDATORS.not_modified} adet 304, {VALIDATORS.unchanged} değişmemiş, "
+                     f"{VALIDATORS.parsed} ayrıştırıldı")
+            stats = CATALOGUE.stats()
+            log.info(f"🗂️  Katalog: {stats['series']} dizi, {stats['episodes']} giriş, {stats['strings']} tekil string, "
+                     f"{stats['subtitle_sets']} altyazı listesi ({stats['shared_subtitle_lists']} kez paylaşıldı)",
+                     extra={'catalogue': stats})
+        if written:
+            log.info(f"📁 Master playlist oluşturuldu: {MASTER_PLAYLIST} ({self.count} item).")
+        return written
+
+def process_all_series(series_page_url, max_series=None):
+    """Tüm dizileri işler; master playlist yazıldıysa True döner"""
+    try:
+        return AtpSource(series_page_url, max_series).run()
     except Exception as e:
-        print(f"❌ process_all_series genel hata: {e}")
+        log.exception(f"❌ process_all_series genel hata: {e}")
+        return False
 
 def main():
-    # Tüm diziler sayfası URL'si
-    all_series_url = "https://diziyiizle.com/?post_type=series"
     # Tüm dizileri çekmek için None, test için küçük bir sayı (örn. 5) verebilirsiniz.
     max_series_limit = None 
     
-    print("🚀 TÜM DİZİLERİN M3U8 VE ALTYAZILARI TOPLANIYOR")
-    print("⚡ FULL MODE: Tüm diziler işlenecek!")
-    print("⏰ Bu işlem uzun sürebilir...")
+    setup_logging('atp')
+    log.info("🚀 TÜM DİZİLERİN M3U8 VE ALTYAZILARI TOPLANIYOR")
+    log.info("⚡ FULL MODE: Tüm diziler işlenecek!")
+    log.info("⏰ Bu işlem uzun sürebilir...")
     
-    process_all_series(all_series_url, max_series=max_series_limit)
+    process_all_series(ALL_SERIES_URL, max_series=max_series_limit)
+    report('atp', METRICS_FILE)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file